@@ -5,35 +5,125 @@ This module creates a graph representation of the Milan Metro system using Netwo
 and performs basic analysis of key characteristics.
 """
 
+import hashlib
 import json
+from dataclasses import dataclass
+from enum import IntEnum
+import numpy as np
 import networkx as nx
+from scipy.sparse import csgraph
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard json parser is used instead
+    orjson = None
+
+
+class Line(IntEnum):
+    """
+    Metro line codes, including the combined codes of transfer stations.
+    
+    Members are small consecutive integers, so they can index LINE_COLORS directly.
+    """
+    M1 = 0
+    M2 = 1
+    M3 = 2
+    M5 = 3
+    M1_M2 = 4
+    M1_M3 = 5
+    M1_M5 = 6
+    M2_M3 = 7
+    M2_M5 = 8
+    M3_M5 = 9
+
+    @property
+    def label(self):
+        """Line code as written in the JSON data, e.g. 'M1-M2'."""
+        return self.name.replace('_', '-')
+
+
+LINE_CODE = {line.label: line for line in Line}
+
+
+@dataclass
+class MetroData:
+    """
+    Station and edge data stored column-wise as flat arrays.
+    
+    Attributes:
+        station_ids: Station IDs (int32)
+        station_names: Station names, aligned with station_ids
+        station_lines: Line codes of stations (int8 values of Line)
+        latitudes: Station latitudes (float64)
+        longitudes: Station longitudes (float64)
+        edge_from: Source station ID of each edge (int32)
+        edge_to: Target station ID of each edge (int32)
+        edge_lines: Line codes of edges (int8 values of Line)
+        edge_weights: Travel time of each edge in minutes (float64)
+        source_digest: SHA-256 hex digest of the raw JSON input files
+    """
+    station_ids: np.ndarray
+    station_names: list
+    station_lines: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    edge_from: np.ndarray
+    edge_to: np.ndarray
+    edge_lines: np.ndarray
+    edge_weights: np.ndarray
+    source_digest: str
+
+
+def _read_json(path, digest):
+    """
+    Parse a JSON file, using orjson when it is installed.
+    
+    Args:
+        path: Path to the JSON file
+        digest: hashlib object updated with the raw file bytes
+        
+    Returns:
+        Parsed JSON document
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest.update(raw)
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 
 def load_data():
     """
     Load station and edge data from JSON files.
     
     Returns:
-        Tuple containing stations list and edges list from JSON files
+        MetroData with station and edge columns from JSON files
     """
-    with open('stations.json', 'r', encoding='utf-8') as f:
-        stations_data = json.load(f)
-    
-    with open('edges.json', 'r', encoding='utf-8') as f:
-        edges_data = json.load(f)
+    digest = hashlib.sha256()
+    stations = _read_json('stations.json', digest)['stations']
+    edges = _read_json('edges.json', digest)['edges']
     
-    return stations_data['stations'], edges_data['edges']
+    return MetroData(
+        station_ids=np.fromiter((s['id'] for s in stations), dtype=np.int32, count=len(stations)),
+        station_names=[s['name'] for s in stations],
+        station_lines=np.fromiter((LINE_CODE[s['line']] for s in stations), dtype=np.int8, count=len(stations)),
+        latitudes=np.fromiter((s['coordinates'][0] for s in stations), dtype=np.float64, count=len(stations)),
+        longitudes=np.fromiter((s['coordinates'][1] for s in stations), dtype=np.float64, count=len(stations)),
+        edge_from=np.fromiter((e['from'] for e in edges), dtype=np.int32, count=len(edges)),
+        edge_to=np.fromiter((e['to'] for e in edges), dtype=np.int32, count=len(edges)),
+        edge_lines=np.fromiter((LINE_CODE[e['line']] for e in edges), dtype=np.int8, count=len(edges)),
+        edge_weights=np.fromiter((e['weight'] for e in edges), dtype=np.float64, count=len(edges)),
+        source_digest=digest.hexdigest(),
+    )
 
 
-def create_metro_graph(stations, edges):
+def create_metro_graph(data):
     """
     Create Milan metro graph from stations and edges data.
     
     Args:
-        stations: List of station dictionaries with id, name, line, coordinates
-        edges: List of edge dictionaries with from, to, line, weight
+        data: MetroData with station and edge columns
         
     Returns:
         NetworkX Graph representing the Milan metro system
@@ -41,18 +131,20 @@ def create_metro_graph(stations, edges):
     # Create undirected graph
     G = nx.Graph()
     
-    # Add nodes (stations) with attributes
-    for station in stations:
-        G.add_node(station['id'], 
-                  name=station['name'],
-                  line=station['line'],
-                  coordinates=station['coordinates'])
+    # Add nodes (stations) with attributes in one batch
+    G.add_nodes_from((station_id, {'name': name, 'line': line, 'coordinates': [lat, lon]})
+                     for station_id, name, line, lat, lon in zip(data.station_ids.tolist(),
+                                                                 data.station_names,
+                                                                 map(Line, data.station_lines.tolist()),
+                                                                 data.latitudes.tolist(),
+                                                                 data.longitudes.tolist()))
     
-    # Add edges (connections between stations) with attributes
-    for edge in edges:
-        G.add_edge(edge['from'], edge['to'],
-                  line=edge['line'],
-                  weight=edge['weight'])
+    # Add edges (connections between stations) with attributes in one batch
+    G.add_edges_from((u, v, {'line': line, 'weight': weight})
+                     for u, v, line, weight in zip(data.edge_from.tolist(),
+                                                   data.edge_to.tolist(),
+                                                   map(Line, data.edge_lines.tolist()),
+                                                   data.edge_weights.tolist()))
     
     return G
 
@@ -78,6 +170,10 @@ def get_line_colors():
     }
 
 
+# Colors indexed by Line code
+LINE_COLORS = tuple(get_line_colors()[line.label] for line in Line)
+
+
 def visualize_graph(G):
     """
     Visualize the Milan metro graph with color-coded metro lines.
@@ -87,29 +183,12 @@ def visualize_graph(G):
     """
     fig = plt.figure(figsize=(16.0, 12.0))
     
-    # Get colors for metro lines
-    colors = get_line_colors()
-    
-    # Position nodes based on geographical coordinates
-    pos = {}
-    for node in G.nodes():
-        coords = G.nodes[node]['coordinates']
-        pos[node] = (coords[1], coords[0])  # longitude, latitude
-    
-    # Group edges by metro lines for color mapping
-    edge_colors = []
-    for _, _, data in G.edges(data=True):
-        # Ensure the 'line' value is treated as a string for lookup
-        line = str(data.get('line', ''))
-        color = colors.get(line, '#95a5a6')
-        edge_colors.append(color)
-    
-    # Group nodes by metro lines for color mapping
-    node_colors = []
-    for node, data in G.nodes(data=True):
-        line = str(data.get('line', ''))
-        color = colors.get(line, '#95a5a6')
-        node_colors.append(color)
+    # Position nodes based on geographical coordinates (longitude, latitude)
+    pos = {node: (coords[1], coords[0]) for node, coords in G.nodes(data='coordinates')}
+    
+    # Color edges and nodes by metro line
+    edge_colors = [LINE_COLORS[line] for _, _, line in G.edges(data='line')]
+    node_colors = [LINE_COLORS[line] for _, line in G.nodes(data='line')]
     
     # Draw the graph with colored nodes and edges
     nx.draw(G, pos,
@@ -122,11 +201,11 @@ def visualize_graph(G):
     
     # Create legend for metro lines
     legend_elements = [
-        mpatches.Patch(color=colors['M1'], label='M1 (Red Line)'),
-        mpatches.Patch(color=colors['M2'], label='M2 (Green Line)'),
-        mpatches.Patch(color=colors['M3'], label='M3 (Yellow Line)'),
-        mpatches.Patch(color=colors['M5'], label='M5 (Purple Line)'),
-        mpatches.Patch(color=colors['M1-M2'], label='Transfer Stations')
+        mpatches.Patch(color=LINE_COLORS[Line.M1], label='M1 (Red Line)'),
+        mpatches.Patch(color=LINE_COLORS[Line.M2], label='M2 (Green Line)'),
+        mpatches.Patch(color=LINE_COLORS[Line.M3], label='M3 (Yellow Line)'),
+        mpatches.Patch(color=LINE_COLORS[Line.M5], label='M5 (Purple Line)'),
+        mpatches.Patch(color=LINE_COLORS[Line.M1_M2], label='Transfer Stations')
     ]
     plt.legend(handles=legend_elements, loc='upper left')
     
@@ -160,24 +239,27 @@ def analyze_graph_characteristics(G):
     print(f"Graph is connected: {is_connected}")
     
     if is_connected:
-        # Calculate path characteristics
-        avg_path_length = nx.average_shortest_path_length(G)   
-        diameter = nx.diameter(G)   
+        # Calculate path characteristics from one all-pairs BFS (hop counts)
+        adjacency = nx.to_scipy_sparse_array(G, weight=None, format='csr')
+        hops = csgraph.shortest_path(adjacency, directed=False, unweighted=True)
+        avg_path_length = hops.sum() / (num_nodes * (num_nodes - 1)) if num_nodes > 1 else 0.0
+        diameter = int(hops.max())
         
         print(f"Average shortest path length: {avg_path_length:.2f}")
         print(f"Graph diameter: {diameter}")
     
     # Degree analysis
-    degrees = dict(G.degree())   
-    avg_degree = sum(degrees.values()) / len(degrees)   
-    max_degree = max(degrees.values())   
-    min_degree = min(degrees.values())
+    nodes = list(G.nodes())
+    degrees = np.fromiter((degree for _, degree in G.degree(nodes)), dtype=np.int32, count=num_nodes)
+    avg_degree = degrees.mean()
+    max_degree = int(degrees.max())
+    min_degree = int(degrees.min())
     print(f"Average degree: {avg_degree:.2f}")
     print(f"Maximum degree: {max_degree}")
     print(f"Minimum degree: {min_degree}")
     
     # Find nodes with maximum degree
-    max_degree_nodes = [node for node, degree in degrees.items() if degree == max_degree]   
+    max_degree_nodes = [nodes[i] for i in np.flatnonzero(degrees == max_degree)]
     print(f"Stations with highest degree ({max_degree}):")
     for node in max_degree_nodes:   
         station_name = G.nodes[node]['name']   
@@ -193,11 +275,11 @@ def main():
     try:
         # Load data from JSON files
         print("Loading data...")
-        stations, edges = load_data()
+        data = load_data()
         
         # Create graph
         print("Creating graph...")
-        G = create_metro_graph(stations, edges)
+        G = create_metro_graph(data)
         
         # Analyze graph characteristics
         analyze_graph_characteristics(G)
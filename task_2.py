@@ -5,12 +5,33 @@ This module implements Depth-First Search (DFS) and Breadth-First Search (BFS)
 algorithms to find paths in the Milan Metro system graph created in Task 1.
 """
 
+import sys
 import networkx as nx
 from collections import deque
 from task_1 import load_data, create_metro_graph
 
 
-def dfs_path(graph, start, goal, path=None):
+def _reconstruct_path(parent, goal):
+    """
+    Rebuild a path by following parent pointers back from the goal.
+    
+    Args:
+        parent: Dictionary mapping each visited node to the node it was reached from
+        goal: Target node ID
+        
+    Returns:
+        List representing the path from start to goal
+    """
+    path = []
+    node = goal
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def dfs_path(graph, start, goal):
     """
     Depth-First Search algorithm to find a path between two nodes.
     
@@ -18,27 +39,33 @@ def dfs_path(graph, start, goal, path=None):
         graph: NetworkX graph
         start: Starting node ID
         goal: Target node ID
-        path: Current path (used for recursion)
         
     Returns:
         List representing the path from start to goal, or None if no path exists
     """
-    if path is None:
-        path = []
+    # Raw adjacency dicts avoid building a neighbor iterator per visit
+    adj = graph._adj
     
-    # Add current node to path
-    path = path + [start]
+    # Stack for DFS: each element is (node, node_it_was_reached_from)
+    stack = [(start, None)]
+    parent = {}
     
-    # If we reached the goal, return the path
-    if start == goal:
-        return path
-    
-    # Explore neighbors
-    for neighbor in graph.neighbors(start):
-        if neighbor not in path:  # Avoid cycles
-            new_path = dfs_path(graph, neighbor, goal, path)
-            if new_path:
-                return new_path
+    while stack:
+        current_node, previous_node = stack.pop()
+        
+        # A node may be pushed by several neighbors; expand it only once
+        if current_node in parent:
+            continue
+        parent[current_node] = previous_node
+        
+        # If we reached the goal, rebuild the path from parent pointers
+        if current_node == goal:
+            return _reconstruct_path(parent, goal)
+        
+        # Push neighbors in reverse so the first neighbor is explored first
+        for neighbor in reversed(adj[current_node]):
+            if neighbor not in parent:  # Avoid cycles
+                stack.append((neighbor, current_node))
     
     return None
 
@@ -58,29 +85,50 @@ def bfs_path(graph, start, goal):
     if start == goal:
         return [start]
     
-    # Queue for BFS: each element is (current_node, path_to_current_node)
-    queue = deque([(start, [start])])
-    visited = {start}
+    # Raw adjacency dicts avoid building a neighbor iterator per visit
+    adj = graph._adj
+    
+    # Queue for BFS holds nodes only; paths are rebuilt from parent pointers,
+    # and the parent dict doubles as the visited set
+    queue = deque([start])
+    parent = {start: None}
+    enqueue, dequeue = queue.append, queue.popleft
     
     while queue:
-        current_node, path = queue.popleft()
+        current_node = dequeue()
         
         # Explore neighbors
-        for neighbor in graph.neighbors(current_node):
-            if neighbor not in visited:
-                new_path = path + [neighbor]
-                
-                # If we found the goal, return the path
-                if neighbor == goal:
-                    return new_path
-                
-                # Add to queue for further exploration
-                queue.append((neighbor, new_path))
-                visited.add(neighbor)
+        for neighbor in adj[current_node]:
+            if neighbor in parent:
+                continue
+            parent[neighbor] = current_node
+            
+            # Stop as soon as the goal is discovered, before queueing it
+            if neighbor == goal:
+                return _reconstruct_path(parent, goal)
+            
+            # Add to queue for further exploration
+            enqueue(neighbor)
     
     return None
 
 
+def get_station_names(graph):
+    """
+    Get mapping of all station IDs to names.
+    
+    The mapping is a snapshot of the graph; build it once per batch of
+    output and pass it to the printing functions.
+    
+    Args:
+        graph: NetworkX graph
+        
+    Returns:
+        Dictionary mapping station IDs to station name strings
+    """
+    return dict(graph.nodes(data='name'))
+
+
 def get_station_name(graph, station_id):
     """
     Get station name by ID.
@@ -95,7 +143,25 @@ def get_station_name(graph, station_id):
     return graph.nodes[station_id]['name']
 
 
-def print_path_details(graph, path, algorithm_name):
+def format_route(names, path):
+    """
+    Format a path as numbered route lines, one per station.
+    
+    Args:
+        names: Dictionary mapping station IDs to names (see get_station_names)
+        path: Non-empty list of station IDs representing the path
+        
+    Returns:
+        List of route line strings
+    """
+    lines = [f"  Start: {names[path[0]]}"]
+    lines += [f"  {i}: {names[station_id]}" for i, station_id in enumerate(path[1:-1], 1)]
+    if len(path) > 1:
+        lines.append(f"  End: {names[path[-1]]}")
+    return lines
+
+
+def print_path_details(graph, path, algorithm_name, names=None):
     """
     Print detailed information about the found path.
     
@@ -103,23 +169,18 @@ def print_path_details(graph, path, algorithm_name):
         graph: NetworkX graph
         path: List of station IDs representing the path
         algorithm_name: Name of the algorithm used (DFS or BFS)
+        names: Optional station ID to name mapping from get_station_names(graph)
     """
     if not path:
         print(f"{algorithm_name}: No path found")
         return
     
-    print(f"\n{algorithm_name} Path:")
-    print(f"Length: {len(path)} stations")
-    print("Route:")
-    
-    for i, station_id in enumerate(path):
-        station_name = get_station_name(graph, station_id)
-        if i == 0:
-            print(f"  Start: {station_name}")
-        elif i == len(path) - 1:
-            print(f"  End: {station_name}")
-        else:
-            print(f"  {i}: {station_name}")
+    # Write the whole block at once instead of one print per station
+    lines = [f"\n{algorithm_name} Path:",
+             f"Length: {len(path)} stations",
+             "Route:"]
+    lines += format_route(names if names is not None else get_station_names(graph), path)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def compare_algorithms(graph, start_station, end_station):
@@ -143,8 +204,9 @@ def compare_algorithms(graph, start_station, end_station):
     bfs_result = bfs_path(graph, start_station, end_station)
     
     # Print results
-    print_path_details(graph, dfs_result, "DFS")
-    print_path_details(graph, bfs_result, "BFS")
+    names = get_station_names(graph)
+    print_path_details(graph, dfs_result, "DFS", names)
+    print_path_details(graph, bfs_result, "BFS", names)
     
     # Compare results
     print(f"\nCOMPARISON:")
@@ -174,8 +236,8 @@ def main():
     try:
         # Load data and create graph using functions from task_1
         print("Loading Milan Metro data...")
-        stations, edges = load_data()
-        G = create_metro_graph(stations, edges)
+        data = load_data()
+        G = create_metro_graph(data)
         
         print(f"Graph loaded: {G.number_of_nodes()} stations, {G.number_of_edges()} connections")
         
@@ -5,109 +5,289 @@ This module implements Dijkstra's algorithm to find the shortest weighted paths
 in the Milan Metro system graph created in Task 1.
 """
 
+import os
+import sys
 import networkx as nx
+import numpy as np
+from scipy.sparse import csgraph
 from task_1 import load_data, create_metro_graph
-from task_2 import get_station_name
+from task_2 import format_route, get_station_name, get_station_names
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernels then run as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
 
-def dijkstra(graph, start):
+
+def _adjacency_matrix(graph):
+    """
+    Convert graph to a SciPy CSR adjacency matrix.
+    
+    The conversion reflects the graph at call time; build it once per batch
+    of queries and pass it to the search functions via their adjacency argument.
+    
+    Args:
+        graph: NetworkX graph with weighted edges
+        
+    Returns:
+        Tuple containing (csr_matrix, nodelist, index), where nodelist maps
+        matrix rows to vertex IDs and index maps vertex IDs back to rows
+    """
+    nodelist = list(graph.nodes())
+    matrix = nx.to_scipy_sparse_array(graph, nodelist=nodelist, weight='weight', format='csr')
+    index = {vertex: row for row, vertex in enumerate(nodelist)}
+    return matrix, nodelist, index
+
+
+def load_distance_matrix(adjacency, source_digest):
+    """
+    Get all-pairs shortest distances, persisted on disk between runs.
+    
+    The matrix is saved to .metrocache_<digest>.npy and later runs memory-map
+    it instead of searching again. The digest must describe the exact graph
+    adjacency was built from, e.g. MetroData.source_digest for a graph made
+    by create_metro_graph; a missing, damaged or wrongly sized file is
+    recomputed and replaced.
+    
+    Args:
+        adjacency: (csr_matrix, nodelist, index) tuple from _adjacency_matrix(graph)
+        source_digest: Hex digest identifying the graph's input data
+        
+    Returns:
+        N x N numpy array of shortest distances (infinity for unreachable pairs),
+        with rows and columns ordered like adjacency's nodelist
+    """
+    matrix, nodelist, _ = adjacency
+    cache_path = f".metrocache_{source_digest[:12]}.npy"
+    try:
+        distances = np.load(cache_path, mmap_mode='r')
+        if distances.shape == (len(nodelist), len(nodelist)):
+            return distances
+        del distances
+    except (OSError, ValueError, EOFError):
+        pass  # Missing or damaged cache file; recompute and overwrite it
+
+    distances = csgraph.dijkstra(matrix, directed=False)
+
+    # Write to a temporary file and rename it, so readers never see a partial matrix
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            np.save(f, distances)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # The disk cache is best-effort; results stay valid without it
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    return distances
+
+
+def _distance_row(adjacency, start, distance_matrix=None):
+    """
+    Get shortest distances from start vertex, ordered like adjacency's nodelist.
+    
+    Args:
+        adjacency: (csr_matrix, nodelist, index) tuple from _adjacency_matrix(graph)
+        start: Starting vertex ID
+        distance_matrix: Optional all-pairs matrix from load_distance_matrix;
+            without it a single-source search is run
+        
+    Returns:
+        1-D numpy array of shortest distances
+    """
+    matrix, _, index = adjacency
+    if distance_matrix is not None:
+        return distance_matrix[index[start]]
+    return csgraph.dijkstra(matrix, directed=False, indices=index[start])
+
+
+def dijkstra(graph, start, adjacency=None):
     """
     Dijkstra's algorithm implementation for finding shortest paths from start vertex.
     
     Args:
         graph: NetworkX graph with weighted edges
         start: Starting vertex ID
+        adjacency: Optional (csr_matrix, nodelist, index) tuple from
+            _adjacency_matrix(graph), reused across queries on an unchanged graph
         
     Returns:
         Dictionary with shortest distances from start to all other vertices
     """
-    # Initialize distances and unvisited vertices set
-    distances = {vertex: float('infinity') for vertex in graph.nodes()}
-    distances[start] = 0
-    unvisited = list(graph.nodes())
+    if adjacency is None:
+        adjacency = _adjacency_matrix(graph)
+    return dict(zip(adjacency[1], _distance_row(adjacency, start).tolist()))
+
 
-    while unvisited:
-        # Find vertex with minimum distance among unvisited
-        current_vertex = min(unvisited, key=lambda vertex: distances[vertex])
+@njit(cache=True)
+def _heap_less(keys, values, i, j):
+    """Order heap entries by (key, value), matching tuple comparison in heapq."""
+    return keys[i] < keys[j] or (keys[i] == keys[j] and values[i] < values[j])
 
-        # If current distance is infinity, we're done
-        if distances[current_vertex] == float('infinity'):
+
+@njit(cache=True)
+def _heap_push(keys, values, size, key, value):
+    """Push (key, value) onto a binary heap stored in parallel arrays; return new size."""
+    position = size
+    keys[position] = key
+    values[position] = value
+    while position > 0:
+        parent = (position - 1) // 2
+        if not _heap_less(keys, values, position, parent):
             break
+        keys[position], keys[parent] = keys[parent], keys[position]
+        values[position], values[parent] = values[parent], values[position]
+        position = parent
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(keys, values, size):
+    """Pop the smallest (key, value) from a binary heap in parallel arrays; return it and new size."""
+    key, value = keys[0], values[0]
+    size -= 1
+    keys[0], values[0] = keys[size], values[size]
+    position = 0
+    while True:
+        smallest = position
+        left = 2 * position + 1
+        right = left + 1
+        if left < size and _heap_less(keys, values, left, smallest):
+            smallest = left
+        if right < size and _heap_less(keys, values, right, smallest):
+            smallest = right
+        if smallest == position:
+            break
+        keys[position], keys[smallest] = keys[smallest], keys[position]
+        values[position], values[smallest] = values[smallest], values[position]
+        position = smallest
+    return key, value, size
+
+
+@njit(cache=True)
+def _bidirectional_dijkstra_csr(indptr, indices, weights, n, source, target):
+    """
+    Bidirectional Dijkstra search over symmetric CSR arrays with rows numbered 0..n-1.
+    
+    Compiled with Numba when it is installed, otherwise runs as plain Python.
+    
+    Args:
+        indptr: CSR row pointer array
+        indices: CSR column index array
+        weights: CSR edge weight array
+        n: Number of vertices
+        source: Starting row
+        target: Target row
+        
+    Returns:
+        Tuple containing (shortest_distance, meeting_row, previous), where
+        previous is a 2 x n array of predecessor rows for the forward and
+        backward searches (-1 marks no predecessor); meeting_row is -1 if
+        the searches never met
+    """
+    # Row 0 holds the forward search from source, row 1 the backward search from target
+    distances = np.full((2, n), np.inf)
+    previous = np.full((2, n), -1, dtype=np.int32)
+    distances[0, source] = 0.0
+    distances[1, target] = 0.0
+
+    # Each relaxation pushes at most one entry, so the heaps never outgrow the edge count
+    capacity = len(indices) + 1
+    heap_keys = np.empty((2, capacity))
+    heap_values = np.empty((2, capacity), dtype=np.int64)
+    heap_sizes = np.zeros(2, dtype=np.int64)
+    heap_sizes[0] = _heap_push(heap_keys[0], heap_values[0], 0, 0.0, source)
+    heap_sizes[1] = _heap_push(heap_keys[1], heap_values[1], 0, 0.0, target)
+    best_distance = np.inf
+    meeting_row = -1
+
+    while heap_sizes[0] > 0 and heap_sizes[1] > 0:
+        # No unexplored route can beat the best one found so far
+        if heap_keys[0, 0] + heap_keys[1, 0] >= best_distance:
+            break
+
+        # Expand the search with the smaller frontier
+        side = 0 if heap_sizes[0] <= heap_sizes[1] else 1
+        other = 1 - side
+        current_distance, current_row, heap_sizes[side] = _heap_pop(
+            heap_keys[side], heap_values[side], heap_sizes[side])
+
+        # Skip stale entries left behind by later improvements
+        if current_distance > distances[side, current_row]:
+            continue
 
         # Check all neighbors of current vertex
-        for neighbor in graph.neighbors(current_vertex):
-            if neighbor in unvisited:
-                # Get edge weight
-                weight = graph[current_vertex][neighbor]['weight']
-                distance = distances[current_vertex] + weight
+        for k in range(indptr[current_row], indptr[current_row + 1]):
+            neighbor = indices[k]
+            distance = current_distance + weights[k]
 
-                # If new distance is shorter, update shortest path
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
+            # If new distance is shorter, update shortest path
+            if distance < distances[side, neighbor]:
+                distances[side, neighbor] = distance
+                previous[side, neighbor] = current_row
+                heap_sizes[side] = _heap_push(heap_keys[side], heap_values[side],
+                                              heap_sizes[side], distance, neighbor)
 
-        # Remove current vertex from unvisited set
-        unvisited.remove(current_vertex)
+                # Neighbor already reached by the other search closes a route
+                total_distance = distance + distances[other, neighbor]
+                if total_distance < best_distance:
+                    best_distance = total_distance
+                    meeting_row = neighbor
 
-    return distances
+    return best_distance, meeting_row, previous
 
 
-def dijkstra_path(graph, start, end):
+def dijkstra_path(graph, start, end, adjacency=None):
     """
-    Find shortest path between two vertices using Dijkstra's algorithm.
+    Find shortest path between two vertices using bidirectional Dijkstra's algorithm.
+    
+    Two searches grow at once, one from start and one from end, and the
+    shortest path is stitched together where their frontiers meet. This
+    settles far fewer vertices than a single search from start.
     
     Args:
         graph: NetworkX graph with weighted edges
         start: Starting vertex ID
         end: Target vertex ID
+        adjacency: Optional (csr_matrix, nodelist, index) tuple from
+            _adjacency_matrix(graph), reused across queries on an unchanged graph
         
     Returns:
         Tuple containing (shortest_distance, path_list)
     """
-    # Initialize distances, previous vertices, and unvisited set
-    distances = {vertex: float('infinity') for vertex in graph.nodes()}
-    previous = {vertex: None for vertex in graph.nodes()}
-    distances[start] = 0
-    unvisited = list(graph.nodes())
+    if start == end:
+        return 0, [start]
 
-    while unvisited:
-        # Find vertex with minimum distance among unvisited
-        current_vertex = min(unvisited, key=lambda vertex: distances[vertex])
+    if adjacency is None:
+        adjacency = _adjacency_matrix(graph)
+    matrix, nodelist, index = adjacency
+    best_distance, meeting_row, previous = _bidirectional_dijkstra_csr(
+        matrix.indptr, matrix.indices, matrix.data, len(nodelist), index[start], index[end])
 
-        # If we reached the target or distance is infinity
-        if current_vertex == end or distances[current_vertex] == float('infinity'):
-            break
-
-        # Check all neighbors of current vertex
-        for neighbor in graph.neighbors(current_vertex):
-            if neighbor in unvisited:
-                # Get edge weight
-                weight = graph[current_vertex][neighbor]['weight']
-                distance = distances[current_vertex] + weight
-
-                # If new distance is shorter, update shortest path
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    previous[neighbor] = current_vertex
-
-        # Remove current vertex from unvisited set
-        unvisited.remove(current_vertex)
-
-    # Reconstruct path
-    path = []
-    current = end
-    while current is not None:
-        path.append(current)
-        current = previous[current]
-    path.reverse()
-
-    # Return distance and path (empty path if no route found)
-    if distances[end] == float('infinity'):
+    # Return empty path if the searches never met
+    if meeting_row < 0:
         return float('infinity'), []
-    else:
-        return distances[end], path
 
+    # Reconstruct path: start -> meeting vertex, then meeting vertex -> end
+    rows = []
+    current = meeting_row
+    while current >= 0:
+        rows.append(current)
+        current = previous[0, current]
+    rows.reverse()
+
+    current = previous[1, meeting_row]
+    while current >= 0:
+        rows.append(current)
+        current = previous[1, current]
 
-def print_shortest_path(graph, start, end, distance, path):
+    return float(best_distance), [nodelist[row] for row in rows]
+
+
+def print_shortest_path(graph, start, end, distance, path, names=None):
     """
     Print detailed information about the shortest path found by Dijkstra.
     
@@ -117,30 +297,56 @@ def print_shortest_path(graph, start, end, distance, path):
         end: Target station ID
         distance: Shortest distance (weighted)
         path: List of station IDs in the shortest path
+        names: Optional station ID to name mapping from get_station_names(graph)
     """
-    start_name = get_station_name(graph, start)
-    end_name = get_station_name(graph, end)
+    if names is None:
+        names = get_station_names(graph)
+    start_name = names[start]
+    end_name = names[end]
     
-    print(f"\nSHORTEST PATH: {start_name} -> {end_name}")
-    print(f"Total distance (travel time): {distance:.2f} minutes")
-    print(f"Number of stations: {len(path)}")
-    print("Route:")
+    # Write the whole block at once instead of one print per station
+    lines = [f"\nSHORTEST PATH: {start_name} -> {end_name}",
+             f"Total distance (travel time): {distance:.2f} minutes",
+             f"Number of stations: {len(path)}",
+             "Route:"]
+    lines += format_route(names, path) if path else ["  No path found"]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _select_sorted(values, count, largest=False):
+    """
+    Select positions of the count smallest (or largest) values without a full sort.
     
-    if not path:
-        print("  No path found")
-        return
+    Candidates are found with an O(N) partition; only they are sorted. The
+    result is ordered ascending by (value, position), exactly like the matching
+    slice of a stable full sort.
     
-    for i, station_id in enumerate(path):
-        station_name = get_station_name(graph, station_id)
-        if i == 0:
-            print(f"  Start: {station_name}")
-        elif i == len(path) - 1:
-            print(f"  End: {station_name}")
-        else:
-            print(f"  {i}: {station_name}")
+    Args:
+        values: 1-D numpy array
+        count: Number of positions to select
+        largest: Select the largest values instead of the smallest
+        
+    Returns:
+        Numpy array of selected positions
+    """
+    count = min(count, len(values))
+    if count <= 0:
+        return np.empty(0, dtype=np.intp)
 
+    if count < len(values):
+        # Keep every value tied with the boundary so ties resolve by position
+        keys = -values if largest else values
+        threshold = np.partition(keys, count - 1)[count - 1]
+        candidates = np.flatnonzero(keys <= threshold)
+    else:
+        candidates = np.arange(len(values))
+
+    ordered = candidates[np.argsort(values[candidates], kind='stable')]
+    return ordered[-count:] if largest else ordered[:count]
 
-def analyze_station_distances(graph, station_id, closest_count=10, farthest_count=5):
+
+def analyze_station_distances(graph, station_id, closest_count=10, farthest_count=5,
+                              adjacency=None, distance_matrix=None, names=None):
     """
     Analyze distances from a given station to all other stations.
     
@@ -149,40 +355,55 @@ def analyze_station_distances(graph, station_id, closest_count=10, farthest_coun
         station_id: ID of the station to analyze from
         closest_count: Number of closest stations to display
         farthest_count: Number of farthest stations to display
+        adjacency: Optional (csr_matrix, nodelist, index) tuple from
+            _adjacency_matrix(graph), reused across queries on an unchanged graph
+        distance_matrix: Optional all-pairs matrix from load_distance_matrix
+        names: Optional station ID to name mapping from get_station_names(graph)
     """
-    station_name = get_station_name(graph, station_id)
+    if names is None:
+        names = get_station_names(graph)
+    station_name = names[station_id]
     
     print(f"DISTANCES FROM {station_name.upper()} TO ALL STATIONS:")
     print("-" * 50)
     
-    distances = dijkstra(graph, station_id)
-    sorted_distances = sorted(distances.items(), key=lambda x: x[1])
+    if adjacency is None:
+        adjacency = _adjacency_matrix(graph)
+    nodelist = adjacency[1]
+    distances = _distance_row(adjacency, station_id, distance_matrix)
     
     # Show closest stations (excluding the starting station itself)
     print("CLOSEST STATIONS:")
-    closest_stations = [item for item in sorted_distances if item[1] > 0][:closest_count]
-    for station_id, distance in closest_stations:
-        station_name = get_station_name(graph, station_id)
-        print(f"  {station_name}: {distance:.2f} minutes")
+    others = np.flatnonzero(distances > 0)
+    for row in others[_select_sorted(distances[others], closest_count)]:
+        station_name = names[nodelist[row]]
+        print(f"  {station_name}: {distances[row]:.2f} minutes")
     
     # Show farthest stations
     print("\nFARTHEST STATIONS:")
-    for station_id, distance in sorted_distances[-farthest_count:]:
-        station_name = get_station_name(graph, station_id)
-        print(f"  {station_name}: {distance:.2f} minutes")
+    for row in _select_sorted(distances, farthest_count, largest=True):
+        station_name = names[nodelist[row]]
+        print(f"  {station_name}: {distances[row]:.2f} minutes")
 
 
-def analyze_shortest_paths(graph):
+def analyze_shortest_paths(graph, source_digest=None):
     """
     Analyze shortest paths from several key stations in the metro system.
     
     Args:
         graph: NetworkX graph with weighted edges
+        source_digest: Optional digest of the data the graph was built from;
+            when given, all-pair distances are cached on disk between runs
     """
     print("=" * 70)
     print("DIJKSTRA'S ALGORITHM - SHORTEST WEIGHTED PATHS ANALYSIS")
     print("=" * 70)
     
+    # Convert the graph and collect station names once for all queries below
+    adjacency = _adjacency_matrix(graph)
+    names = get_station_names(graph)
+    distance_matrix = load_distance_matrix(adjacency, source_digest) if source_digest else None
+    
     # Test shortest paths between key stations (same as Task 2 for consistency)
     test_pairs = [
         (1, 20),   # Rho Fiera to Inganni
@@ -192,8 +413,8 @@ def analyze_shortest_paths(graph):
     ]
     
     for start_id, end_id in test_pairs:
-        distance, path = dijkstra_path(graph, start_id, end_id)
-        print_shortest_path(graph, start_id, end_id, distance, path)
+        distance, path = dijkstra_path(graph, start_id, end_id, adjacency)
+        print_shortest_path(graph, start_id, end_id, distance, path, names)
         print()
     
     # Analyze distances from key transportation hubs
@@ -203,7 +424,8 @@ def analyze_shortest_paths(graph):
     ]
     
     for station_id, description in key_stations:
-        analyze_station_distances(graph, station_id)
+        analyze_station_distances(graph, station_id, adjacency=adjacency,
+                                  distance_matrix=distance_matrix, names=names)
         print()
 
 def main():
@@ -213,8 +435,8 @@ def main():
     try:
         # Load data and create graph
         print("Loading Milan Metro data...")
-        stations, edges = load_data()
-        G = create_metro_graph(stations, edges)
+        metro_data = load_data()
+        G = create_metro_graph(metro_data)
         
         print(f"Graph loaded: {G.number_of_nodes()} stations, {G.number_of_edges()} connections")
         print(f"Graph has weighted edges: {nx.is_weighted(G)}")
@@ -224,10 +446,11 @@ def main():
         print("\nSample edge weights:")
         
         # Calculate weight statistics
-        weights = [data['weight'] for u, v, data in G.edges(data=True)]
-        min_weight = min(weights)
-        max_weight = max(weights)
-        avg_weight = sum(weights) / len(weights)
+        weights = np.fromiter((weight for _, _, weight in G.edges(data='weight')),
+                              dtype=np.float64, count=G.number_of_edges())
+        min_weight = weights.min()
+        max_weight = weights.max()
+        avg_weight = weights.mean()
         
         print(f"Minimum weight: {min_weight} minutes")
         print(f"Maximum weight: {max_weight} minutes")
@@ -242,7 +465,7 @@ def main():
         
         
         # Run Dijkstra's algorithm analysis
-        analyze_shortest_paths(G)
+        analyze_shortest_paths(G, metro_data.source_digest)
         
     except FileNotFoundError as e:
         print(f"Error: Required data files not found - {e}")